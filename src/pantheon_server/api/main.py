@@ -5,35 +5,122 @@ This module provides the main FastAPI application for the Pantheon Server,
 exposing REST endpoints for cryptocurrency analysis and market data.
 """
 
+import asyncio
+import functools
+import hashlib
 import os
-from datetime import datetime
-from typing import Dict, List, Optional
-
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple, cast
+
+import orjson
+import pandas as pd
+from fastapi import FastAPI, BackgroundTasks, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from legends import LegendType, Pantheon
-from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from legends import LegendType
+from loguru import logger
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from dotenv import load_dotenv
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing_extensions import Annotated
 
 # Load environment variables FIRST
 load_dotenv()
 
-from ..services import CoinbaseService, PantheonMarketAnalyzer, RedisService
+from ..services import CoinbaseService, PantheonMarketAnalyzer, RedisService, indicators
 
 # Initialize services
 coinbase_service = CoinbaseService()
 market_analyzer = PantheonMarketAnalyzer(coinbase_service)
 redis_service = RedisService()
 
+# Engine registry is static per process; reuse the analyzer's Pantheon instance
+AVAILABLE_ENGINES: List[str] = list(market_analyzer.available_engines)
+
+# Popular pairs are a static list; build the response value once
+POPULAR_PAIRS: List[str] = list(CoinbaseService.POPULAR_PAIRS)
+
+# Same serializer options as ORJSONResponse, for hand-encoded payloads (numpy scalars included)
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+# In-process TTL cache for rarely-changing responses: {key: (expires_at, value)}
+_ttl_cache: Dict[str, Tuple[float, Any]] = {}
+PRODUCTS_CACHE_TTL = 60  # seconds
+HEALTH_CACHE_TTL = 1  # seconds
+
+_TEST_RESPONSE_BODY = orjson.dumps({"message": "Server is working!", "status": "ok"})
+
+
+def _ttl_cache_get(key: str) -> Optional[Any]:
+    """Return a cached value if present and not expired"""
+    entry = _ttl_cache.get(key)
+    if entry is not None and time.monotonic() < entry[0]:
+        return entry[1]
+    return None
+
+
+def _ttl_cache_set(key: str, value: Any, ttl: float) -> None:
+    """Store a value in the in-process cache for ttl seconds"""
+    _ttl_cache[key] = (time.monotonic() + ttl, value)
+
+
 app = FastAPI(
     title="Pantheon Server",
     description="Cryptocurrency analysis server using Pantheon Legends framework",
     version="0.1.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
+
+class UnhandledErrorMiddleware:
+    """
+    Translate any unhandled endpoint error into a JSON 500 response
+    
+    Registered inside CORSMiddleware so error responses keep their CORS headers;
+    a handler for Exception would run in the outermost ServerErrorMiddleware
+    and lose them.
+    """
+    
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        response_started = False
+        
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as exc:
+            # A partially sent (e.g. streaming) response can't be replaced
+            if response_started:
+                raise
+            
+            logger.exception(f"Unhandled error on {scope['path']}: {exc}")
+            response = ORJSONResponse(
+                status_code=500,
+                content={"error": type(exc).__name__, "detail": str(exc), "path": scope["path"]}
+            )
+            await response(scope, receive, send)
+
+
+# Added before CORS so it sits inside the CORS layer
+app.add_middleware(UnhandledErrorMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -44,476 +131,660 @@ app.add_middleware(
 )
 
 
+class SelectiveGZipMiddleware(GZipMiddleware):
+    """
+    GZip middleware that leaves streaming endpoints uncompressed
+    
+    The gzip compressor only emits output once the response completes, which would
+    hold back every NDJSON line of /scan/stream until the scan finished.
+    """
+    
+    def __init__(self, app: ASGIApp, excluded_paths: Iterable[str] = (), **kwargs: Any) -> None:
+        super().__init__(app, **kwargs)
+        self.excluded_paths = frozenset(excluded_paths)
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+# Compress large responses (/scan results, candle backfills); small payloads are sent as-is
+app.add_middleware(
+    SelectiveGZipMiddleware,
+    excluded_paths=("/scan/stream",),
+    minimum_size=1024,
+    compresslevel=5
+)
+
+
+@app.on_event("startup")
+async def startup_event() -> None:
+    """Open shared connections, start the blocking I/O pool and warm up indicator kernels"""
+    await coinbase_service.init_session()
+    
+    # Dedicated threads for the synchronous Redis client, sized to its connection pool
+    # so threads never outnumber available connections
+    app.state.redis_pool = ThreadPoolExecutor(
+        max_workers=redis_service.connection_pool.max_connections,
+        thread_name_prefix="redis"
+    )
+    
+    indicators.warmup()
+
+
+@app.on_event("shutdown")
+async def shutdown_event() -> None:
+    """Release shared connections and the blocking I/O pool"""
+    await coinbase_service.close_session()
+    app.state.redis_pool.shutdown(wait=False)
+
+
+async def run_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking Redis call on the dedicated pool without stalling the event loop"""
+    loop = asyncio.get_running_loop()
+    pool = getattr(app.state, "redis_pool", None)
+    return await loop.run_in_executor(pool, functools.partial(func, *args, **kwargs))
+
+
+def now_iso() -> str:
+    """Per-request UTC timestamp, computed once and shared by the response"""
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _request_fingerprint(request: BaseModel) -> str:
+    """Compact, stable identifier for a request body"""
+    return hashlib.blake2b(request.model_dump_json().encode(), digest_size=8).hexdigest()
+
+
+def _describe_request(request: BaseModel, echo: bool) -> Dict[str, Any]:
+    """Request metadata for responses; the full body is only echoed on demand"""
+    described: Dict[str, Any] = {"request_id": _request_fingerprint(request)}
+    if echo:
+        described["request"] = request.model_dump(mode="json")
+    return described
+
+
 # Pydantic models for request/response
+MAX_SCAN_PAIRS = 500
+PRODUCT_ID_PATTERN = re.compile(r"[A-Z0-9]{2,10}-[A-Z]{3,5}")
+
+
 class AnalysisRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+    
     product_id: str
     legend_type: LegendType = LegendType.TRADITIONAL
-    timeframes: Optional[List[str]] = ["5m", "15m", "1h"]
+    timeframes: List[str] = Field(default_factory=lambda: ["5m", "15m", "1h"])
     max_candles: int = 200
     force_refresh: bool = False  # New field for cache bypass
 
 
 class ScanRequest(BaseModel):
-    product_ids: List[str]
+    model_config = ConfigDict(frozen=True, extra="forbid")
+    
+    product_ids: Annotated[List[str], Field(min_length=1, max_length=MAX_SCAN_PAIRS)]
     legend_type: LegendType = LegendType.SCANNER
     timeframe: str = "5m"
     max_candles: int = 100
     force_refresh: bool = False  # New field for cache bypass
+    
+    @field_validator("product_ids", mode="before")
+    @classmethod
+    def validate_product_ids(cls, value: Any) -> Any:
+        """Check every product ID against the Coinbase format in one pass"""
+        if isinstance(value, list):
+            invalid = [
+                p for p in value
+                if not isinstance(p, str) or not PRODUCT_ID_PATTERN.fullmatch(p)
+            ]
+            if invalid:
+                raise ValueError(f"Invalid product IDs: {', '.join(map(str, invalid[:10]))}")
+        return value
+
+
+class ScanSummary(BaseModel):
+    total_pairs: int
+    successful_scans: int
+    failed_scans: int
+    success_rate: float
+
+
+class ScanResponse(BaseModel):
+    """Documented /scan response shape (the handler returns an ORJSONResponse directly)"""
+    
+    success: bool
+    request_id: str
+    request: Optional[Dict[str, Any]] = None
+    summary: ScanSummary
+    results: Dict[str, Dict[str, Any]]
+    timestamp: str
 
 
 @app.get("/")
-async def root() -> Dict[str, str]:
+async def root(timestamp: str = Depends(now_iso)) -> Dict[str, Any]:
     """Root endpoint returning basic server information"""
-    try:
-        return {
-            "service": "Pantheon Server",
-            "version": "0.1.0",
-            "description": "Cryptocurrency analysis using Pantheon Legends",
-            "timestamp": datetime.utcnow().isoformat(),
-            "docs": "/docs",
-            "endpoints": {
-                "health": "/health",
-                "engines": "/engines",
-                "products": "/products",
-                "analyze": "/analyze",
-                "scan": "/scan",
-                "ema9": "/ema9/{product_id}",
-                "overview": "/overview"
-            }
+    return {
+        "service": "Pantheon Server",
+        "version": "0.1.0",
+        "description": "Cryptocurrency analysis using Pantheon Legends",
+        "timestamp": timestamp,
+        "docs": "/docs",
+        "endpoints": {
+            "health": "/health",
+            "engines": "/engines",
+            "products": "/products",
+            "analyze": "/analyze",
+            "scan": "/scan",
+            "scan_stream": "/scan/stream",
+            "ema9": "/ema9/{product_id}",
+            "overview": "/overview"
         }
-    except Exception as e:
-        return {"error": str(e), "type": type(e).__name__}
+    }
 
 
 @app.get("/health")
-async def health_check() -> Dict[str, str]:
+async def health_check() -> Response:
     """Health check endpoint for monitoring including Redis status"""
-    try:
-        redis_health = redis_service.health_check()
-        redis_status = redis_health.get("status", "unknown")
-    except Exception:
-        redis_status = "unavailable"
+    # Polled at high frequency: serve a pre-serialized body refreshed at most once per second
+    body = _ttl_cache_get("health")
+    if body is None:
+        try:
+            redis_health = await run_blocking(redis_service.health_check)
+            redis_status = redis_health.get("status", "unknown")
+        except Exception:
+            redis_status = "unavailable"
+        
+        body = orjson.dumps({
+            "status": "healthy" if redis_status == "healthy" else "degraded",
+            "timestamp": now_iso(),
+            "service": "pantheon-server",
+            "pantheon_legends": "connected",
+            "coinbase_api": "available",
+            "redis_cache": redis_status
+        })
+        _ttl_cache_set("health", body, HEALTH_CACHE_TTL)
     
-    return {
-        "status": "healthy" if redis_status == "healthy" else "degraded",
-        "timestamp": datetime.utcnow().isoformat(),
-        "service": "pantheon-server",
-        "pantheon_legends": "connected",
-        "coinbase_api": "available",
-        "redis_cache": redis_status
-    }
+    return Response(body, media_type="application/json")
 
 
 @app.get("/test")
-async def test_endpoint() -> Dict[str, str]:
+async def test_endpoint() -> Response:
     """Simple test endpoint for debugging"""
-    return {"message": "Server is working!", "status": "ok"}
+    return Response(_TEST_RESPONSE_BODY, media_type="application/json")
 
 
 @app.get("/engines")
-async def list_engines() -> Dict[str, List[str]]:
+async def list_engines(timestamp: str = Depends(now_iso)) -> Dict[str, Any]:
     """List available analysis engines"""
-    try:
-        pantheon = Pantheon.create_default()
-        engines = pantheon.available_engines
-        return {
-            "available_engines": list(engines),
-            "timestamp": datetime.utcnow().isoformat(),
-            "descriptions": {
-                "traditional": "Classic technical analysis with traditional indicators",
-                "scanner": "Advanced scanning engine for pattern detection"
-            }
+    return {
+        "available_engines": AVAILABLE_ENGINES,
+        "timestamp": timestamp,
+        "descriptions": {
+            "traditional": "Classic technical analysis with traditional indicators",
+            "scanner": "Advanced scanning engine for pattern detection"
         }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error retrieving engines: {str(e)}")
+    }
 
 
 @app.get("/products")
-async def get_products() -> Dict:
+async def get_products(timestamp: str = Depends(now_iso)) -> Dict:
     """Get available cryptocurrency trading pairs"""
-    try:
+    products = _ttl_cache_get("products")
+    if products is None:
         products = await coinbase_service.get_products()
-        popular_pairs = coinbase_service.get_popular_crypto_pairs()
-        
-        return {
-            "total_products": len(products),
-            "popular_pairs": popular_pairs,
-            "all_products": [p.get("id") for p in products if p.get("id")],
-            "timestamp": datetime.utcnow().isoformat()
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching products: {str(e)}")
+        _ttl_cache_set("products", products, PRODUCTS_CACHE_TTL)
+    
+    return {
+        "total_products": len(products),
+        "popular_pairs": POPULAR_PAIRS,
+        "all_products": [p.get("id") for p in products if p.get("id")],
+        "timestamp": timestamp
+    }
 
 
 @app.post("/analyze")
-async def analyze_crypto(request: AnalysisRequest) -> Dict:
+async def analyze_crypto(
+    request: AnalysisRequest,
+    echo: bool = False,
+    timestamp: str = Depends(now_iso)
+) -> ORJSONResponse:
     """Analyze a cryptocurrency pair using specified engine and timeframes with Redis caching"""
-    try:
-        cache_status = "miss"
-        cache_age_seconds = 0
-        results = {}
-        
-        # Check if force refresh is requested
-        if not request.force_refresh:
-            # Try to get cached results for each timeframe
-            for timeframe in request.timeframes:
-                cached_result = redis_service.get_cached_analysis(
-                    product_id=request.product_id,
-                    timeframe=timeframe,
-                    legend_type=request.legend_type.value
-                )
-                
-                if cached_result:
-                    # Calculate cache age
-                    cache_time = datetime.fromisoformat(cached_result['cached_at'])
-                    cache_age = datetime.utcnow() - cache_time
-                    cache_age_seconds = cache_age.total_seconds()
-                    
-                    # Remove cache metadata from result
-                    clean_result = {k: v for k, v in cached_result.items() 
-                                  if k not in ['cached_at', 'cache_key']}
-                    results[timeframe] = clean_result
-                    cache_status = "hit"
-        
-        # If we have cached results for all timeframes, return them
-        if len(results) == len(request.timeframes) and not request.force_refresh:
-            return {
-                "success": True,
-                "request": request.dict(),
-                "results": results,
-                "cache_status": cache_status,
-                "cache_age_seconds": int(cache_age_seconds),
-                "data_freshness": "cached",
-                "timestamp": datetime.utcnow().isoformat()
-            }
-        
-        # Otherwise, fetch fresh data
-        fresh_results = await market_analyzer.analyze_crypto_pair(
-            product_id=request.product_id,
-            legend_type=request.legend_type,
-            timeframes=request.timeframes,
-            max_candles=request.max_candles
-        )
-        
-        # Cache the fresh results
-        for timeframe, result in fresh_results.items():
-            redis_service.cache_analysis_result(
+    cache_status = "miss"
+    cache_age_seconds = 0
+    results = {}
+    
+    # Check if force refresh is requested
+    if not request.force_refresh:
+        # Try to get cached results for each timeframe
+        for timeframe in request.timeframes:
+            cached_result = await run_blocking(
+                redis_service.get_cached_analysis,
                 product_id=request.product_id,
                 timeframe=timeframe,
-                legend_type=request.legend_type.value,
-                result=result
+                legend_type=request.legend_type.value
             )
-        
-        cache_status = "refreshed" if request.force_refresh else "miss"
-        
-        return {
+            
+            # Error entries are never served from cache so a transient failure can recover
+            if cached_result and "error" not in cached_result:
+                # Calculate cache age
+                cache_time = datetime.fromisoformat(cached_result['cached_at'])
+                cache_age = datetime.utcnow() - cache_time
+                cache_age_seconds = cache_age.total_seconds()
+                
+                # Remove cache metadata from result
+                clean_result = {k: v for k, v in cached_result.items() 
+                              if k not in ['cached_at', 'cache_key']}
+                results[timeframe] = clean_result
+                cache_status = "hit"
+    
+    # If we have cached results for all timeframes, return them
+    if len(results) == len(request.timeframes) and not request.force_refresh:
+        return ORJSONResponse({
             "success": True,
-            "request": request.dict(),
-            "results": fresh_results,
+            **_describe_request(request, echo),
+            "results": results,
             "cache_status": cache_status,
-            "cache_age_seconds": 0,
-            "data_freshness": "live",
-            "timestamp": datetime.utcnow().isoformat()
-        }
+            "cache_age_seconds": int(cache_age_seconds),
+            "data_freshness": "cached",
+            "timestamp": timestamp
+        })
     
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
-
-
-@app.post("/scan")
-async def scan_multiple_pairs(request: ScanRequest) -> Dict:
+    # Otherwise, fetch fresh data
+    fresh_results = await market_analyzer.analyze_crypto_pair(
+        product_id=request.product_id,
+        legend_type=request.legend_type,
+        timeframes=request.timeframes,
+        max_candles=request.max_candles,
+        force_refresh=request.force_refresh
+    )
+    
+    # Cache the fresh results, skipping per-timeframe errors (e.g. a transient Coinbase 429)
+    await asyncio.gather(*[
+        run_blocking(
+            redis_service.cache_analysis_result,
+            product_id=request.product_id,
+            timeframe=timeframe,
+            legend_type=request.legend_type.value,
+            result=result
+        )
+        for timeframe, result in fresh_results.items()
+        if "error" not in result
+    ])
+    
+    cache_status = "refreshed" if request.force_refresh else "miss"
+    
+    return ORJSONResponse({
+        "success": True,
+        **_describe_request(request, echo),
+        "results": fresh_results,
+        "cache_status": cache_status,
+        "cache_age_seconds": 0,
+        "data_freshness": "live",
+        "timestamp": timestamp
+    })
+
+
+@app.post("/scan", responses={200: {"model": ScanResponse}})
+async def scan_multiple_pairs(
+    request: ScanRequest,
+    echo: bool = False,
+    timestamp: str = Depends(now_iso)
+) -> ORJSONResponse:
     """Scan multiple cryptocurrency pairs for trading opportunities"""
-    try:
-        results = await market_analyzer.scan_multiple_pairs(
+    results = await market_analyzer.scan_multiple_pairs(
+        product_ids=request.product_ids,
+        legend_type=request.legend_type,
+        timeframe=request.timeframe,
+        max_candles=request.max_candles,
+        force_refresh=request.force_refresh
+    )
+    
+    # Count successful vs failed scans
+    successful = sum(1 for r in results.values() if "error" not in r)
+    failed = len(results) - successful
+    
+    return ORJSONResponse({
+        "success": True,
+        **_describe_request(request, echo),
+        "summary": {
+            "total_pairs": len(request.product_ids),
+            "successful_scans": successful,
+            "failed_scans": failed,
+            "success_rate": (successful / len(request.product_ids)) * 100
+        },
+        "results": results,
+        "timestamp": timestamp
+    })
+
+
+@app.post("/scan/stream")
+async def stream_scan_multiple_pairs(
+    request: ScanRequest,
+    timestamp: str = Depends(now_iso)
+) -> StreamingResponse:
+    """Scan multiple cryptocurrency pairs, streaming one NDJSON line per completed pair"""
+    
+    async def generate() -> AsyncIterator[bytes]:
+        successful = 0
+        failed = 0
+        async for product_id, result in market_analyzer.iter_scan_results(
             product_ids=request.product_ids,
-            engine_type=request.engine_type,
+            legend_type=request.legend_type,
             timeframe=request.timeframe,
-            max_candles=request.max_candles
-        )
-        
-        # Count successful vs failed scans
-        successful = sum(1 for r in results.values() if "error" not in r)
-        failed = len(results) - successful
+            max_candles=request.max_candles,
+            force_refresh=request.force_refresh
+        ):
+            if "error" in result:
+                failed += 1
+            else:
+                successful += 1
+            yield orjson.dumps(
+                {"product_id": product_id, "result": result}, option=ORJSON_OPTIONS
+            ) + b"\n"
         
-        return {
-            "success": True,
-            "request": request.dict(),
+        # Final line carries the summary accumulated while streaming
+        yield orjson.dumps({
+            "request_id": _request_fingerprint(request),
             "summary": {
                 "total_pairs": len(request.product_ids),
                 "successful_scans": successful,
                 "failed_scans": failed,
                 "success_rate": (successful / len(request.product_ids)) * 100
             },
-            "results": results,
-            "timestamp": datetime.utcnow().isoformat()
-        }
+            "timestamp": timestamp
+        }, option=ORJSON_OPTIONS) + b"\n"
     
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Scan failed: {str(e)}")
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
 
 
 @app.get("/ema9/{product_id}")
-async def ema9_fakeout_analysis(product_id: str, max_candles: int = 200) -> Dict:
+async def ema9_fakeout_analysis(
+    product_id: str,
+    max_candles: int = 200,
+    timestamp: str = Depends(now_iso)
+) -> ORJSONResponse:
     """Run EMA(9) fakeout analysis on a specific cryptocurrency pair"""
-    try:
-        signals = await market_analyzer.get_ema9_fakeout_signals(
-            product_id=product_id,
-            max_candles=max_candles
-        )
-        
-        return {
-            "success": True,
-            "product_id": product_id,
-            "strategy": "EMA(9) Multi-timeframe Fakeout Detection",
-            "signals": signals,
-            "timestamp": datetime.utcnow().isoformat()
-        }
+    signals = await market_analyzer.get_ema9_fakeout_signals(
+        product_id=product_id,
+        max_candles=max_candles
+    )
     
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"EMA(9) analysis failed: {str(e)}")
+    return ORJSONResponse({
+        "success": True,
+        "product_id": product_id,
+        "strategy": "EMA(9) Multi-timeframe Fakeout Detection",
+        "signals": signals,
+        "timestamp": timestamp
+    })
 
 
 @app.get("/overview")
 async def market_overview(
     popular_only: bool = True,
     legend_type: LegendType = LegendType.TRADITIONAL,
-    force_refresh: bool = False
-) -> Dict:
+    force_refresh: bool = False,
+    timestamp: str = Depends(now_iso)
+) -> ORJSONResponse:
     """Get a comprehensive market overview with Redis caching"""
-    try:
-        cache_key = f"overview:{popular_only}:{legend_type.value}"
-        cache_status = "miss"
-        cache_age_seconds = 0
+    cache_key = f"overview:{popular_only}:{legend_type.value}"
+    cache_status = "miss"
+    cache_age_seconds = 0
+    
+    # Check cache first (unless force refresh)
+    if not force_refresh:
+        cached_overview = await run_blocking(redis_service.get, f"pantheon:cache:{cache_key}")
         
-        # Check cache first (unless force refresh)
-        if not force_refresh:
-            cached_overview = redis_service.get(f"pantheon:cache:{cache_key}")
+        if cached_overview:
+            cache_time = datetime.fromisoformat(cached_overview['cached_at'])
+            cache_age = datetime.utcnow() - cache_time
+            cache_age_seconds = cache_age.total_seconds()
             
-            if cached_overview:
-                cache_time = datetime.fromisoformat(cached_overview['cached_at'])
-                cache_age = datetime.utcnow() - cache_time
-                cache_age_seconds = cache_age.total_seconds()
-                
-                # Return cached if still fresh (10 minutes TTL)
-                if cache_age_seconds < 600:  # 10 minutes
-                    return {
-                        "success": True,
-                        "overview": cached_overview['data'],
-                        "cache_status": "hit",
-                        "cache_age_seconds": int(cache_age_seconds),
-                        "data_freshness": "cached",
-                        "timestamp": datetime.utcnow().isoformat()
-                    }
-        
-        # Fetch fresh overview data
-        overview = await market_analyzer.get_market_overview(
-            popular_pairs_only=popular_only,
-            legend_type=legend_type
-        )
-        
-        # Cache the fresh overview
-        cache_data = {
-            "data": overview,
-            "cached_at": datetime.utcnow().isoformat()
-        }
-        redis_service.set(f"pantheon:cache:{cache_key}", cache_data, ttl=600)  # 10 minutes
-        
-        cache_status = "refreshed" if force_refresh else "miss"
-        
-        return {
-            "success": True,
-            "overview": overview,
-            "cache_status": cache_status,
-            "cache_age_seconds": 0,
-            "data_freshness": "live",
-            "timestamp": datetime.utcnow().isoformat()
-        }
+            # Return cached if still fresh (10 minutes TTL)
+            if cache_age_seconds < 600:  # 10 minutes
+                return ORJSONResponse({
+                    "success": True,
+                    "overview": cached_overview['data'],
+                    "cache_status": "hit",
+                    "cache_age_seconds": int(cache_age_seconds),
+                    "data_freshness": "cached",
+                    "timestamp": timestamp
+                })
     
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Market overview failed: {str(e)}")
+    # Fetch fresh overview data
+    overview = await market_analyzer.get_market_overview(
+        popular_pairs_only=popular_only,
+        legend_type=legend_type,
+        force_refresh=force_refresh
+    )
+    
+    # Cache the fresh overview
+    cache_data = {
+        "data": overview,
+        "cached_at": datetime.utcnow().isoformat()
+    }
+    await run_blocking(
+        redis_service.set, f"pantheon:cache:{cache_key}", cache_data, ttl=600  # 10 minutes
+    )
+    
+    cache_status = "refreshed" if force_refresh else "miss"
+    
+    return ORJSONResponse({
+        "success": True,
+        "overview": overview,
+        "cache_status": cache_status,
+        "cache_age_seconds": 0,
+        "data_freshness": "live",
+        "timestamp": timestamp
+    })
 
 
 @app.get("/ticker/{product_id}")
-async def get_ticker(product_id: str) -> Dict:
+async def get_ticker(product_id: str, timestamp: str = Depends(now_iso)) -> Dict:
     """Get current ticker information for a cryptocurrency pair"""
-    try:
-        ticker = await coinbase_service.get_product_ticker(product_id)
-        
-        return {
-            "success": True,
-            "product_id": product_id,
-            "ticker": ticker,
-            "timestamp": datetime.utcnow().isoformat()
-        }
+    ticker = await coinbase_service.get_product_ticker(product_id)
     
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Ticker fetch failed: {str(e)}")
+    return {
+        "success": True,
+        "product_id": product_id,
+        "ticker": ticker,
+        "timestamp": timestamp
+    }
 
 
 @app.get("/candles/{product_id}")
 async def get_candles(
     product_id: str,
     timeframe: str = "300",
-    max_candles: int = 100
-) -> Dict:
+    max_candles: int = 100,
+    timestamp: str = Depends(now_iso)
+) -> ORJSONResponse:
     """Get historical candle data for a cryptocurrency pair"""
-    try:
-        df = await coinbase_service.get_product_candles(
-            product_id=product_id,
-            timeframe=timeframe,
-            max_candles=max_candles
+    if timeframe not in CoinbaseService.GRANULARITIES:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"Invalid timeframe '{timeframe}'; expected granularity in seconds, one of "
+                f"{', '.join(CoinbaseService.GRANULARITIES)}"
+            )
         )
-        
-        # Convert DataFrame to JSON-serializable format
-        candles_data = []
-        for timestamp, row in df.iterrows():
-            candles_data.append({
-                "timestamp": timestamp.isoformat(),
-                "open": float(row['open']),
-                "high": float(row['high']),
-                "low": float(row['low']),
-                "close": float(row['close']),
-                "volume": float(row['volume'])
-            })
-        
-        return {
-            "success": True,
-            "product_id": product_id,
-            "timeframe": timeframe,
-            "candle_count": len(candles_data),
-            "candles": candles_data,
-            "timestamp": datetime.utcnow().isoformat()
-        }
     
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Candles fetch failed: {str(e)}")
+    df = await coinbase_service.get_product_candles(
+        product_id=product_id,
+        timeframe=timeframe,
+        max_candles=max_candles
+    )
+    
+    # Convert DataFrame to JSON-serializable format: format all timestamps in one
+    # C loop and convert each column to Python floats with a single tolist() call
+    candles_data = []
+    if not df.empty:
+        timestamps = cast(pd.DatetimeIndex, df.index).strftime("%Y-%m-%dT%H:%M:%S").tolist()
+        candles_data = [
+            {
+                "timestamp": ts,
+                "open": o,
+                "high": h,
+                "low": l,
+                "close": c,
+                "volume": v
+            }
+            for ts, o, h, l, c, v in zip(
+                timestamps,
+                df["open"].astype(float).tolist(),
+                df["high"].astype(float).tolist(),
+                df["low"].astype(float).tolist(),
+                df["close"].astype(float).tolist(),
+                df["volume"].astype(float).tolist()
+            )
+        ]
+    
+    return ORJSONResponse({
+        "success": True,
+        "product_id": product_id,
+        "timeframe": timeframe,
+        "candle_count": len(candles_data),
+        "candles": candles_data,
+        "timestamp": timestamp
+    })
 
 
 # === Cache Management Endpoints ===
 
 @app.get("/cache/health")
-async def cache_health() -> Dict:
+async def cache_health(timestamp: str = Depends(now_iso)) -> Dict:
     """Get Redis cache health and statistics"""
     try:
-        health = redis_service.health_check()
-        stats = redis_service.get_cache_stats()
+        health = await run_blocking(redis_service.health_check)
+        stats = await run_blocking(redis_service.get_cache_stats)
         
         return {
             "success": True,
             "redis_health": health,
             "cache_statistics": stats,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": timestamp
         }
     except Exception as e:
         return {
             "success": False,
             "error": str(e),
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": timestamp
         }
 
 
 @app.delete("/cache/analysis/{product_id}")
-async def clear_analysis_cache(product_id: str) -> Dict:
+async def clear_analysis_cache(product_id: str, timestamp: str = Depends(now_iso)) -> Dict:
     """Clear analysis cache for a specific product"""
-    try:
-        deleted_count = redis_service.clear_analysis_cache(product_id)
-        
-        return {
-            "success": True,
-            "message": f"Cleared analysis cache for {product_id}",
-            "deleted_keys": deleted_count,
-            "timestamp": datetime.utcnow().isoformat()
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Cache clear failed: {str(e)}")
+    deleted_count = await run_blocking(redis_service.clear_analysis_cache, product_id)
+    
+    return {
+        "success": True,
+        "message": f"Cleared analysis cache for {product_id}",
+        "deleted_keys": deleted_count,
+        "timestamp": timestamp
+    }
 
 
 @app.delete("/cache/overview")
-async def clear_overview_cache() -> Dict:
+async def clear_overview_cache(timestamp: str = Depends(now_iso)) -> Dict:
     """Clear market overview cache"""
-    try:
-        # Clear overview cache keys
-        overview_keys = [
-            "pantheon:cache:overview:True:traditional",
-            "pantheon:cache:overview:True:scanner", 
-            "pantheon:cache:overview:False:traditional",
-            "pantheon:cache:overview:False:scanner"
-        ]
-        
-        deleted_count = 0
-        for key in overview_keys:
-            if redis_service.delete(key):
-                deleted_count += 1
-        
-        return {
-            "success": True,
-            "message": "Cleared market overview cache",
-            "deleted_keys": deleted_count,
-            "timestamp": datetime.utcnow().isoformat()
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Cache clear failed: {str(e)}")
+    # Clear overview cache keys
+    overview_keys = [
+        "pantheon:cache:overview:True:traditional",
+        "pantheon:cache:overview:True:scanner", 
+        "pantheon:cache:overview:False:traditional",
+        "pantheon:cache:overview:False:scanner"
+    ]
+    
+    deleted_count = 0
+    for key in overview_keys:
+        if await run_blocking(redis_service.delete, key):
+            deleted_count += 1
+    
+    return {
+        "success": True,
+        "message": "Cleared market overview cache",
+        "deleted_keys": deleted_count,
+        "timestamp": timestamp
+    }
 
 
 @app.delete("/cache/all")
-async def clear_all_cache() -> Dict:
+async def clear_all_cache(timestamp: str = Depends(now_iso)) -> Dict:
     """Clear all pantheon cache (use with caution)"""
-    try:
-        analysis_deleted = redis_service.clear_analysis_cache()
-        market_deleted = redis_service.clear_market_cache()
-        
-        # Clear general cache
-        general_keys = redis_service.redis_client.keys("pantheon:cache:*")
-        general_deleted = 0
-        if general_keys:
-            general_deleted = redis_service.redis_client.delete(*general_keys)
-        
-        total_deleted = analysis_deleted + market_deleted + general_deleted
-        
-        return {
-            "success": True,
-            "message": "Cleared all pantheon cache",
-            "deleted_breakdown": {
-                "analysis_keys": analysis_deleted,
-                "market_keys": market_deleted, 
-                "general_keys": general_deleted,
-                "total": total_deleted
-            },
-            "timestamp": datetime.utcnow().isoformat()
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Cache clear failed: {str(e)}")
+    analysis_deleted = await run_blocking(redis_service.clear_analysis_cache)
+    market_deleted = await run_blocking(redis_service.clear_market_cache)
+    
+    # Clear general cache
+    general_keys = await run_blocking(redis_service.redis_client.keys, "pantheon:cache:*")
+    general_deleted = 0
+    if general_keys:
+        general_deleted = await run_blocking(redis_service.redis_client.delete, *general_keys)
+    
+    total_deleted = analysis_deleted + market_deleted + general_deleted
+    
+    return {
+        "success": True,
+        "message": "Cleared all pantheon cache",
+        "deleted_breakdown": {
+            "analysis_keys": analysis_deleted,
+            "market_keys": market_deleted, 
+            "general_keys": general_deleted,
+            "total": total_deleted
+        },
+        "timestamp": timestamp
+    }
 
 
 @app.post("/analyze/{product_id}/refresh")
-async def force_analyze_refresh(product_id: str, request: AnalysisRequest) -> Dict:
+async def force_analyze_refresh(
+    product_id: str,
+    request: AnalysisRequest,
+    timestamp: str = Depends(now_iso)
+) -> ORJSONResponse:
     """Force fresh analysis, bypassing cache"""
-    # Override product_id and force_refresh
-    request.product_id = product_id
-    request.force_refresh = True
-    return await analyze_crypto(request)
+    # Override product_id and force_refresh (requests are immutable)
+    request = request.model_copy(update={"product_id": product_id, "force_refresh": True})
+    return await analyze_crypto(request, timestamp=timestamp)
 
 
 @app.post("/overview/refresh")
 async def force_overview_refresh(
     popular_only: bool = True,
-    legend_type: LegendType = LegendType.TRADITIONAL
-) -> Dict:
+    legend_type: LegendType = LegendType.TRADITIONAL,
+    timestamp: str = Depends(now_iso)
+) -> ORJSONResponse:
     """Force fresh market overview, bypassing cache"""
-    return await market_overview(popular_only=popular_only, legend_type=legend_type, force_refresh=True)
+    return await market_overview(
+        popular_only=popular_only,
+        legend_type=legend_type,
+        force_refresh=True,
+        timestamp=timestamp
+    )
 
 
 if __name__ == "__main__":
+    import importlib.util
+    
     import uvicorn
     
     # Load environment variables
     host = os.getenv("HOST", "0.0.0.0")
     port = int(os.getenv("PORT", 8000))
-    reload = os.getenv("RELOAD", "true").lower() == "true"
+    reload = os.getenv("RELOAD", "false").lower() == "true"
+    workers = int(os.getenv("WORKERS", 1))
+    
+    # uvloop and httptools ship with uvicorn[standard]; uvloop is unavailable on Windows
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
     
     uvicorn.run(
         "main:app",
         host=host,
         port=port,
-        reload=reload
+        reload=reload,
+        loop=loop,
+        http=http,
+        workers=workers
     )
@@ -6,10 +6,12 @@ for real-time and historical cryptocurrency market data.
 """
 
 import asyncio
+import importlib.util
 import json
 import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union, cast
 
 import httpx
 import pandas as pd
@@ -26,17 +28,91 @@ class CoinbaseService:
     
     BASE_URL = "https://api.exchange.coinbase.com"
     
-    def __init__(self, rate_limit_per_second: int = 10):
+    # Popular cryptocurrency trading pairs used for overviews and testing
+    POPULAR_PAIRS: Tuple[str, ...] = (
+        "BTC-USD", "ETH-USD", "SOL-USD", "ADA-USD", "DOT-USD",
+        "LINK-USD", "MATIC-USD", "AVAX-USD", "ATOM-USD", "ALGO-USD",
+        "XTZ-USD", "FIL-USD", "AAVE-USD", "UNI-USD", "SUSHI-USD"
+    )
+    
+    # Candle granularities (in seconds) accepted by the Coinbase candles endpoint
+    GRANULARITIES: Tuple[str, ...] = ("60", "300", "900", "3600", "21600", "86400")
+    
+    def __init__(
+        self,
+        rate_limit_per_second: int = 10,
+        candle_cache_size: int = 1024,
+        candle_cache_max_age: int = 60
+    ):
         """
         Initialize the Coinbase service
         
         Args:
             rate_limit_per_second: Maximum requests per second to avoid rate limiting
+            candle_cache_size: Maximum number of recent candle fetches kept in memory
+            candle_cache_max_age: Longest time in seconds a memoized candle fetch is reused
         """
         self.rate_limit = rate_limit_per_second
         self.last_request_time = 0
         self.min_request_interval = 1.0 / rate_limit_per_second
         
+        # Shared HTTP client, created by init_session() when running under the API server
+        self._client: Optional[httpx.AsyncClient] = None
+        
+        # LRU of recent candle fetches keyed by (product_id, timeframe, max_candles, bucket),
+        # plus in-flight fetches so concurrent identical requests share one upstream call
+        self.candle_cache_size = candle_cache_size
+        self.candle_cache_max_age = candle_cache_max_age
+        self._candle_cache: "OrderedDict[Tuple[str, str, int, int], pd.DataFrame]" = OrderedDict()
+        self._candle_inflight: Dict[
+            Tuple[str, str, int, int], "asyncio.Future[pd.DataFrame]"
+        ] = {}
+    
+    async def init_session(self) -> None:
+        """
+        Create a shared, pooled HTTP client reused across all requests
+        
+        Uses HTTP/2 when the h2 package is available so concurrent requests
+        multiplex over a single connection instead of opening one each.
+        """
+        if self._client is None:
+            http2 = importlib.util.find_spec("h2") is not None
+            self._client = httpx.AsyncClient(
+                base_url=self.BASE_URL,
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=20,
+                    max_keepalive_connections=20,
+                    keepalive_expiry=300
+                ),
+                timeout=10.0
+            )
+            protocol = "HTTP/2" if http2 else "HTTP/1.1"
+            logger.info(f"Initialized shared Coinbase HTTP client ({protocol})")
+    
+    async def close_session(self) -> None:
+        """Close the shared HTTP client if one was created"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            logger.info("Closed shared Coinbase HTTP client")
+    
+    async def _get(self, path: str, params: Optional[Dict] = None) -> httpx.Response:
+        """
+        Issue a GET request against the Coinbase API
+        
+        Uses the shared client when initialized, otherwise falls back to a
+        short-lived client (e.g. when called from asyncio.run in the UI).
+        """
+        if self._client is not None:
+            response = await self._client.get(path, params=params)
+        else:
+            async with httpx.AsyncClient(base_url=self.BASE_URL) as client:
+                response = await client.get(path, params=params)
+        
+        response.raise_for_status()
+        return response
+        
     async def _ensure_rate_limit(self) -> None:
         """Ensure we don't exceed the rate limit"""
         current_time = time.time()
@@ -57,18 +133,16 @@ class CoinbaseService:
         """
         await self._ensure_rate_limit()
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(f"{self.BASE_URL}/products")
-                response.raise_for_status()
-                
-                products = response.json()
-                logger.info(f"Retrieved {len(products)} trading pairs from Coinbase")
-                return products
-                
-            except httpx.HTTPError as e:
-                logger.error(f"Error fetching products from Coinbase: {e}")
-                raise
+        try:
+            response = await self._get("/products")
+            
+            products = response.json()
+            logger.info(f"Retrieved {len(products)} trading pairs from Coinbase")
+            return products
+            
+        except httpx.HTTPError as e:
+            logger.error(f"Error fetching products from Coinbase: {e}")
+            raise
     
     async def get_product_candles(
         self,
@@ -76,7 +150,8 @@ class CoinbaseService:
         timeframe: str = "300",  # 5 minutes
         start: Optional[datetime] = None,
         end: Optional[datetime] = None,
-        max_candles: int = 300
+        max_candles: int = 300,
+        force_refresh: bool = False
     ) -> pd.DataFrame:
         """
         Get historical candle data for a specific product
@@ -87,10 +162,69 @@ class CoinbaseService:
             start: Start time for data range
             end: End time for data range  
             max_candles: Maximum number of candles to retrieve
+            force_refresh: Skip memoized and in-flight fetches and query Coinbase directly
             
         Returns:
             DataFrame with OHLCV data indexed by timestamp
         """
+        # Explicit ranges are not memoized; only the rolling "latest candles" window is
+        if start is not None or end is not None:
+            return await self._fetch_product_candles(product_id, timeframe, start, end, max_candles)
+        
+        # Requests within the same candle period reuse a single Coinbase fetch, capped at
+        # candle_cache_max_age so the in-progress candle of long timeframes stays current
+        max_age = min(int(timeframe), self.candle_cache_max_age)
+        bucket = int(time.time() // max_age)
+        key = (product_id, timeframe, max_candles, bucket)
+        
+        future = None
+        if not force_refresh:
+            cached = self._candle_cache.get(key)
+            if cached is not None:
+                self._candle_cache.move_to_end(key)
+                return cast(pd.DataFrame, cached.copy())
+            future = self._candle_inflight.get(key)
+        
+        if future is None:
+            future = asyncio.ensure_future(
+                self._fetch_product_candles(product_id, timeframe, None, None, max_candles)
+            )
+            self._candle_inflight[key] = future
+            future.add_done_callback(lambda f: self._store_candles(key, f))
+        
+        df = await asyncio.shield(future)
+        return cast(pd.DataFrame, df.copy())
+    
+    def _store_candles(
+        self,
+        key: Tuple[str, str, int, int],
+        future: "asyncio.Future[pd.DataFrame]"
+    ) -> None:
+        """Move a completed candle fetch from the in-flight map into the LRU cache"""
+        # A forced refresh may have replaced this fetch in the in-flight map
+        if self._candle_inflight.get(key) is future:
+            del self._candle_inflight[key]
+        if future.cancelled() or future.exception() is not None:
+            return
+        
+        df = future.result()
+        if df.empty:
+            return
+        
+        self._candle_cache[key] = df
+        self._candle_cache.move_to_end(key)
+        while len(self._candle_cache) > self.candle_cache_size:
+            self._candle_cache.popitem(last=False)
+    
+    async def _fetch_product_candles(
+        self,
+        product_id: str,
+        timeframe: str,
+        start: Optional[datetime],
+        end: Optional[datetime],
+        max_candles: int
+    ) -> pd.DataFrame:
+        """Fetch candle data from Coinbase and convert it to a DataFrame"""
         await self._ensure_rate_limit()
         
         # Set default time range if not provided
@@ -107,41 +241,39 @@ class CoinbaseService:
             "granularity": timeframe
         }
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{self.BASE_URL}/products/{product_id}/candles",
-                    params=params
-                )
-                response.raise_for_status()
-                
-                candles = response.json()
-                
-                if not candles:
-                    logger.warning(f"No candle data returned for {product_id}")
-                    return pd.DataFrame()
-                
-                # Convert to DataFrame
-                # Coinbase returns: [timestamp, low, high, open, close, volume]
-                df = pd.DataFrame(candles, columns=['timestamp', 'low', 'high', 'open', 'close', 'volume'])
-                
-                # Convert timestamp to datetime and set as index
-                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')
-                df.set_index('timestamp', inplace=True)
-                
-                # Ensure numeric types
-                for col in ['low', 'high', 'open', 'close', 'volume']:
-                    df[col] = pd.to_numeric(df[col])
-                
-                # Sort by timestamp (oldest first)
-                df.sort_index(inplace=True)
-                
-                logger.info(f"Retrieved {len(df)} candles for {product_id} ({timeframe}s timeframe)")
-                return df
-                
-            except httpx.HTTPError as e:
-                logger.error(f"Error fetching candles for {product_id}: {e}")
-                raise
+        try:
+            response = await self._get(
+                f"/products/{product_id}/candles",
+                params=params
+            )
+            
+            candles = response.json()
+            
+            if not candles:
+                logger.warning(f"No candle data returned for {product_id}")
+                return pd.DataFrame()
+            
+            # Convert to DataFrame
+            # Coinbase returns: [timestamp, low, high, open, close, volume]
+            df = pd.DataFrame(candles, columns=['timestamp', 'low', 'high', 'open', 'close', 'volume'])
+            
+            # Convert timestamp to datetime and set as index
+            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')
+            df.set_index('timestamp', inplace=True)
+            
+            # Ensure numeric types
+            for col in ['low', 'high', 'open', 'close', 'volume']:
+                df[col] = pd.to_numeric(df[col])
+            
+            # Sort by timestamp (oldest first)
+            df.sort_index(inplace=True)
+            
+            logger.info(f"Retrieved {len(df)} candles for {product_id} ({timeframe}s timeframe)")
+            return df
+            
+        except httpx.HTTPError as e:
+            logger.error(f"Error fetching candles for {product_id}: {e}")
+            raise
     
     async def get_product_ticker(self, product_id: str) -> Dict:
         """
@@ -155,25 +287,25 @@ class CoinbaseService:
         """
         await self._ensure_rate_limit()
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(f"{self.BASE_URL}/products/{product_id}/ticker")
-                response.raise_for_status()
-                
-                ticker = response.json()
-                logger.debug(f"Retrieved ticker for {product_id}: ${ticker.get('price', 'N/A')}")
-                return ticker
-                
-            except httpx.HTTPError as e:
-                logger.error(f"Error fetching ticker for {product_id}: {e}")
-                raise
+        try:
+            response = await self._get(f"/products/{product_id}/ticker")
+            
+            ticker = response.json()
+            logger.debug(f"Retrieved ticker for {product_id}: ${ticker.get('price', 'N/A')}")
+            return ticker
+            
+        except httpx.HTTPError as e:
+            logger.error(f"Error fetching ticker for {product_id}: {e}")
+            raise
     
     async def get_multi_timeframe_data(
         self,
         product_id: str,
         timeframes: List[str] = ["60", "300", "900"],  # 1m, 5m, 15m
-        max_candles: int = 300
-    ) -> Dict[str, pd.DataFrame]:
+        max_candles: int = 300,
+        return_exceptions: bool = False,
+        force_refresh: bool = False
+    ) -> Dict[str, Union[pd.DataFrame, BaseException]]:
         """
         Get candle data for multiple timeframes simultaneously
         
@@ -181,20 +313,24 @@ class CoinbaseService:
             product_id: Trading pair ID (e.g., "BTC-USD")
             timeframes: List of timeframe granularities in seconds
             max_candles: Maximum candles per timeframe
+            return_exceptions: Return per-timeframe exceptions instead of raising
+            force_refresh: Bypass memoized candle fetches
             
         Returns:
-            Dictionary mapping timeframe to DataFrame
+            Dictionary mapping timeframe to DataFrame (or the raised exception,
+            including cancellation, when return_exceptions is set and that fetch failed)
         """
         tasks = []
         for timeframe in timeframes:
             task = self.get_product_candles(
                 product_id=product_id,
                 timeframe=timeframe,
-                max_candles=max_candles
+                max_candles=max_candles,
+                force_refresh=force_refresh
             )
             tasks.append(task)
         
-        results = await asyncio.gather(*tasks)
+        results = await asyncio.gather(*tasks, return_exceptions=return_exceptions)
         
         return {
             timeframe: df 
@@ -208,8 +344,4 @@ class CoinbaseService:
         Returns:
             List of popular product IDs
         """
-        return [
-            "BTC-USD", "ETH-USD", "SOL-USD", "ADA-USD", "DOT-USD",
-            "LINK-USD", "MATIC-USD", "AVAX-USD", "ATOM-USD", "ALGO-USD",
-            "XTZ-USD", "FIL-USD", "AAVE-USD", "UNI-USD", "SUSHI-USD"
-        ]
+        return list(self.POPULAR_PAIRS)
@@ -0,0 +1,66 @@
+"""
+Technical Indicators
+
+This module provides fast technical indicator kernels used by the market
+analyzer. Kernels are JIT-compiled with Numba when it is installed and fall
+back to pandas implementations otherwise.
+"""
+
+from typing import Callable, cast
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional dependency
+    NUMBA_AVAILABLE = False
+
+
+def _ema_loop(x: np.ndarray, period: int) -> np.ndarray:
+    """EMA recurrence over a 1-D float64 array (Numba-compiled when available)"""
+    k = 2.0 / (period + 1.0)
+    out: np.ndarray = np.empty_like(x)
+    out[0] = x[0]
+    for i in range(1, x.shape[0]):
+        out[i] = k * x[i] + (1.0 - k) * out[i - 1]
+    return out
+
+
+def _ema_pandas(x: np.ndarray, period: int) -> np.ndarray:
+    """Fallback EMA using pandas when Numba is not installed"""
+    return cast(np.ndarray, pd.Series(x).ewm(span=period, adjust=False).mean().to_numpy())
+
+
+_ema_kernel: Callable[[np.ndarray, int], np.ndarray]
+
+if NUMBA_AVAILABLE:
+    _ema_kernel = njit(cache=True, fastmath=True)(_ema_loop)
+else:
+    _ema_kernel = _ema_pandas
+
+
+def ema(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    Calculate an exponential moving average seeded with the first value
+
+    Args:
+        values: 1-D array of prices
+        period: EMA period (e.g. 9 for EMA(9))
+
+    Returns:
+        Array of EMA values with the same length as the input
+    """
+    x: np.ndarray = np.ascontiguousarray(values, dtype=np.float64)
+    if x.shape[0] == 0:
+        return x
+    return _ema_kernel(x, period)
+
+
+def warmup() -> None:
+    """Trigger JIT compilation so the first request pays no compile cost"""
+    ema(np.zeros(2), 9)
+    backend = "numba" if NUMBA_AVAILABLE else "pandas"
+    logger.debug(f"Indicator kernels warmed up ({backend} backend)")
@@ -6,9 +6,11 @@ to provide comprehensive cryptocurrency analysis and alerts.
 """
 
 import asyncio
+import os
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 from loguru import logger
 from legends import (
@@ -21,6 +23,7 @@ from legends import (
 )
 
 from .coinbase_service import CoinbaseService
+from .indicators import ema
 
 
 class PantheonMarketAnalyzer:
@@ -56,13 +59,18 @@ class PantheonMarketAnalyzer:
             "4h": "14400",  # 4 hours
             "1d": "86400"   # 1 day
         }
+        
+        # Maximum number of pairs analyzed concurrently during scans and overviews
+        self.scan_concurrency = int(os.getenv("SCAN_CONCURRENCY", 10))
+        self.overview_concurrency = int(os.getenv("OVERVIEW_CONCURRENCY", 8))
     
     async def analyze_crypto_pair(
         self,
         product_id: str,
         legend_type: LegendType = LegendType.TRADITIONAL,
         timeframes: Optional[List[str]] = None,
-        max_candles: int = 300
+        max_candles: int = 300,
+        force_refresh: bool = False
     ) -> Dict:
         """
         Analyze a cryptocurrency pair using the specified legend type
@@ -72,6 +80,7 @@ class PantheonMarketAnalyzer:
             legend_type: Which legend type to use (TRADITIONAL or SCANNER)
             timeframes: List of timeframes to analyze (default: 1m, 5m, 15m)
             max_candles: Maximum candles per timeframe
+            force_refresh: Fetch fresh candles instead of reusing memoized ones
             
         Returns:
             Dictionary containing analysis results for each timeframe
@@ -82,12 +91,14 @@ class PantheonMarketAnalyzer:
         logger.info(f"Starting {legend_type.value} analysis for {product_id}")
         
         try:
-            # Get multi-timeframe data from Coinbase
+            # Fetch all timeframes concurrently; a failed fetch only affects its own timeframe
             timeframe_seconds = [self.timeframes[tf] for tf in timeframes]
             market_data = await self.coinbase.get_multi_timeframe_data(
                 product_id=product_id,
                 timeframes=timeframe_seconds,
-                max_candles=max_candles
+                max_candles=max_candles,
+                return_exceptions=True,
+                force_refresh=force_refresh
             )
             
             analysis_results = {}
@@ -96,6 +107,18 @@ class PantheonMarketAnalyzer:
                 tf_seconds = self.timeframes[timeframe]
                 df = market_data.get(tf_seconds)
                 
+                # BaseException so a cancelled shared fetch is reported like any other failure
+                if isinstance(df, BaseException):
+                    logger.error(f"Data fetch failed for {product_id} {timeframe}: {df}")
+                    analysis_results[timeframe] = {
+                        "error": f"Data fetch failed: {df}",
+                        "legend_type": legend_type.value,
+                        "timeframe": timeframe,
+                        "product_id": product_id,
+                        "timestamp": datetime.utcnow().isoformat()
+                    }
+                    continue
+                
                 if df is None or df.empty:
                     logger.warning(f"No data available for {product_id} on {timeframe} timeframe")
                     analysis_results[timeframe] = {
@@ -163,6 +186,7 @@ class PantheonMarketAnalyzer:
         # Basic market analysis
         sma_20 = df['close'].rolling(20).mean().iloc[-1] if len(df) >= 20 else latest_price
         trend = "bullish" if latest_price > sma_20 else "bearish"
+        ema_9 = float(ema(df['close'].to_numpy(dtype=np.float64), 9)[-1])
         
         # Calculate basic momentum
         if len(df) >= 2:
@@ -193,6 +217,7 @@ class PantheonMarketAnalyzer:
                 "volume_ratio": volume / avg_volume if avg_volume > 0 else 1.0,
                 "indicators": {
                     "sma_20": float(sma_20),
+                    "ema_9": ema_9,
                     "trend_strength": abs(momentum),
                     "volume_avg": avg_volume
                 }
@@ -211,7 +236,9 @@ class PantheonMarketAnalyzer:
         product_ids: List[str],
         legend_type: LegendType = LegendType.SCANNER,
         timeframe: str = "5m",
-        max_candles: int = 100
+        max_candles: int = 100,
+        concurrency: Optional[int] = None,
+        force_refresh: bool = False
     ) -> Dict[str, Dict]:
         """
         Scan multiple cryptocurrency pairs for opportunities
@@ -221,37 +248,100 @@ class PantheonMarketAnalyzer:
             legend_type: Which legend type to use
             timeframe: Single timeframe to analyze
             max_candles: Maximum candles per pair
+            concurrency: Maximum pairs analyzed at once (default: scan_concurrency)
+            force_refresh: Fetch fresh candles instead of reusing memoized ones
             
         Returns:
             Dictionary mapping product_id to analysis results
         """
         logger.info(f"Scanning {len(product_ids)} pairs using {legend_type.value} legend on {timeframe}")
         
-        tasks = []
-        for product_id in product_ids:
-            task = self.analyze_crypto_pair(
-                product_id=product_id,
-                legend_type=legend_type,
-                timeframes=[timeframe],
-                max_candles=max_candles
+        # Bound concurrent analyses to avoid Coinbase rate-limit storms
+        semaphore = asyncio.BoundedSemaphore(concurrency or self.scan_concurrency)
+        
+        results = await asyncio.gather(*[
+            self._scan_pair(
+                product_id, semaphore, legend_type, timeframe, max_candles, force_refresh
             )
-            tasks.append(task)
+            for product_id in product_ids
+        ])
         
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        return dict(results)
+    
+    async def iter_scan_results(
+        self,
+        product_ids: List[str],
+        legend_type: LegendType = LegendType.SCANNER,
+        timeframe: str = "5m",
+        max_candles: int = 100,
+        concurrency: Optional[int] = None,
+        force_refresh: bool = False
+    ) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        Scan multiple cryptocurrency pairs, yielding each result as soon as it completes
         
-        scan_results = {}
-        for product_id, result in zip(product_ids, results):
-            if isinstance(result, Exception):
-                logger.error(f"Scan failed for {product_id}: {result}")
-                scan_results[product_id] = {
-                    "error": str(result),
+        Args:
+            product_ids: List of trading pair IDs to scan
+            legend_type: Which legend type to use
+            timeframe: Single timeframe to analyze
+            max_candles: Maximum candles per pair
+            concurrency: Maximum pairs analyzed at once (default: scan_concurrency)
+            force_refresh: Fetch fresh candles instead of reusing memoized ones
+            
+        Yields:
+            (product_id, analysis result) tuples in completion order
+        """
+        logger.info(
+            f"Streaming scan of {len(product_ids)} pairs "
+            f"using {legend_type.value} legend on {timeframe}"
+        )
+        
+        semaphore = asyncio.BoundedSemaphore(concurrency or self.scan_concurrency)
+        tasks = [
+            asyncio.ensure_future(
+                self._scan_pair(
+                    product_id, semaphore, legend_type, timeframe, max_candles, force_refresh
+                )
+            )
+            for product_id in product_ids
+        ]
+        
+        try:
+            for future in asyncio.as_completed(tasks):
+                yield await future
+        finally:
+            # Stop outstanding work if the consumer goes away early
+            for task in tasks:
+                task.cancel()
+    
+    async def _scan_pair(
+        self,
+        product_id: str,
+        semaphore: asyncio.BoundedSemaphore,
+        legend_type: LegendType,
+        timeframe: str,
+        max_candles: int,
+        force_refresh: bool = False
+    ) -> Tuple[str, Dict]:
+        """Analyze a single pair for a scan, converting failures into error results"""
+        async with semaphore:
+            try:
+                result = await self.analyze_crypto_pair(
+                    product_id=product_id,
+                    legend_type=legend_type,
+                    timeframes=[timeframe],
+                    max_candles=max_candles,
+                    force_refresh=force_refresh
+                )
+            except Exception as e:
+                logger.error(f"Scan failed for {product_id}: {e}")
+                return product_id, {
+                    "error": str(e),
                     "timestamp": datetime.utcnow().isoformat()
                 }
-            else:
-                # Extract the single timeframe result
-                scan_results[product_id] = result.get(timeframe, {})
         
-        return scan_results
+        # Extract the single timeframe result
+        return product_id, result.get(timeframe, {})
     
     async def get_ema9_fakeout_signals(
         self,
@@ -311,9 +401,14 @@ class PantheonMarketAnalyzer:
                 ema_signal = "bearish"
                 bearish_count += 1
             
+            price = tf_result.get("latest_price")
+            ema_9 = analysis.get("indicators", {}).get("ema_9")
+            
             fakeout_signals["timeframes"][timeframe] = {
                 "signal": ema_signal,
-                "price": tf_result.get("latest_price"),
+                "price": price,
+                "ema_9": ema_9,
+                "price_vs_ema9": (price - ema_9) / ema_9 * 100 if price and ema_9 else None,
                 "trend": trend,
                 "momentum": analysis.get("momentum", 0),
                 "confidence": analysis.get("confidence", 0.5),
@@ -333,7 +428,8 @@ class PantheonMarketAnalyzer:
     async def get_market_overview(
         self,
         popular_pairs_only: bool = True,
-        legend_type: LegendType = LegendType.TRADITIONAL
+        legend_type: LegendType = LegendType.TRADITIONAL,
+        force_refresh: bool = False
     ) -> Dict:
         """
         Get a broad market overview across multiple cryptocurrency pairs
@@ -341,6 +437,7 @@ class PantheonMarketAnalyzer:
         Args:
             popular_pairs_only: Whether to only analyze popular trading pairs
             legend_type: Which legend type to use
+            force_refresh: Fetch fresh candles instead of reusing memoized ones
             
         Returns:
             Dictionary with market overview and top opportunities
@@ -358,7 +455,9 @@ class PantheonMarketAnalyzer:
             product_ids=pairs,
             legend_type=legend_type,
             timeframe="5m",
-            max_candles=50  # Lighter load for overview
+            max_candles=50,  # Lighter load for overview
+            concurrency=self.overview_concurrency,
+            force_refresh=force_refresh
         )
         
         # Process and rank results